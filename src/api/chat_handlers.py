@@ -9,6 +9,7 @@ import logging
 from typing import Dict, List, Optional
 
 from ..core_app import CocoroCore2App
+from ..core.background_tasks import spawn_background_task
 from ..image import (
     AIInitiativeMessageGenerator,
     ChatHandlerErrorManager,
@@ -147,7 +148,7 @@ class ChatHandlers:
             
             # 完全な会話として記憶保存
             full_conversation = conversation + [{"role": "assistant", "content": ai_response}]
-            asyncio.create_task(self._save_conversation_async(full_conversation, request.user_id))
+            spawn_background_task(self._save_conversation_async(full_conversation, request.user_id))
             
             return UnifiedChatResponse(
                 status="success",
@@ -160,7 +161,7 @@ class ChatHandlers:
             )
         else:
             # AI主導メッセージのみ
-            asyncio.create_task(self._save_conversation_async(
+            spawn_background_task(self._save_conversation_async(
                 [{"role": "assistant", "content": ai_message}], request.user_id
             ))
             
@@ -4,11 +4,11 @@ CocoroCore2 API Services
 各エンドポイントのビジネスロジックを提供
 """
 
-import asyncio
 import logging
 from typing import Dict, Optional
 from ..core_app import CocoroCore2App
 from ..core.session_manager import SessionManager
+from ..core.background_tasks import spawn_background_task
 from ..clients.cocoro_dock_client import CocoroDockClient
 from .models import CoreControlRequest, CoreNotificationRequest, HealthCheckResponse
 from ..log_handler import get_dock_log_handler
@@ -93,7 +93,7 @@ class ControlService:
             self.logger.info("Shutdown command received")
             
             # バックグラウンドでシャットダウン処理を開始
-            asyncio.create_task(self._execute_shutdown())
+            spawn_background_task(self._execute_shutdown())
             
             # 即座に受付確認を返す
             return {
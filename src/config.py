@@ -4,20 +4,60 @@ CocoroCore2 Configuration Management
 MemOS統合による設定管理システム
 """
 
-import argparse
 import json
 import os
 import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
-from pydantic import BaseModel, Field, ValidationError, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+if TYPE_CHECKING:
+    import argparse
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# 実行ディレクトリ（プロセス中は変わらないため起動時に一度だけ決定）
+if getattr(sys, "frozen", False):
+    # PyInstallerなどで固められたexeの場合
+    _BASE_DIR = Path(sys.executable).parent
+else:
+    # 通常のPythonスクリプトとして実行された場合
+    _BASE_DIR = Path(__file__).resolve().parent.parent
+
+# 統合設定ファイル（Setting.json）のパス
+_SETTING_PATH = _BASE_DIR.parent / "UserData2" / "Setting.json"
+
+# 設定ファイルの検索候補（検索順、文字列で事前に構築）
+_CONFIG_CANDIDATES: Tuple[str, ...] = (str(_SETTING_PATH),)
+
+# 設定ファイルの読み込みキャッシュ（パス -> (mtime_ns, size, データ)）
+_config_cache: Dict[str, Tuple[int, int, Any]] = {}
+
+# 検証済み設定オブジェクトのキャッシュ（絶対パス -> (mtime_ns, size, CocoroAIConfig)）
+_config_instance_cache: Dict[str, Tuple[int, int, Any]] = {}
+
+# 解決済みの設定ファイルパス
+_config_path_cache: Optional[str] = None
+
+# 遅延インポートしたMOSConfigクラス
+_MOSConfig = None
 
 
 class CharacterData(BaseModel):
     """キャラクター設定データ"""
 
+    # 読み込み後は変更しない
+    model_config = ConfigDict(frozen=True)
+
     isReadOnly: bool = False
     modelName: str = "つくよみちゃん"
     isUseLLM: bool = False
@@ -34,6 +74,9 @@ class CharacterData(BaseModel):
 class LoggingConfig(BaseModel):
     """ログ設定"""
 
+    # 読み込み後は変更しない
+    model_config = ConfigDict(frozen=True)
+
     level: str = "INFO"
     file: str = "logs/cocoro_core2.log"
     max_size_mb: int = 10
@@ -44,6 +87,9 @@ class LoggingConfig(BaseModel):
 class CocoroAIConfig(BaseModel):
     """CocoroAI統合設定（Setting.json形式）"""
 
+    # 読み込み後は変更しない（CocoroAIConfig.loadのキャッシュで共有されるため）
+    model_config = ConfigDict(frozen=True)
+
     cocoroDockPort: int = 55600
     cocoroCorePort: int = 55601
     cocoroMemoryPort: int = 55602
@@ -108,6 +154,14 @@ class CocoroAIConfig(BaseModel):
         char = self.current_character
         return char.modelName if char else "つくよみちゃん"
 
+    def fingerprint(self) -> bytes:
+        """設定内容のフィンガープリントを取得（再読み込み時の変更検出用）
+
+        Returns:
+            bytes: キーをソートしたJSON表現
+        """
+        return _dumps_sorted(self.model_dump())
+
     @classmethod
     def load(cls, config_path: Optional[str] = None) -> "CocoroAIConfig":
         """設定ファイルから設定を読み込む
@@ -116,23 +170,36 @@ class CocoroAIConfig(BaseModel):
             config_path: 設定ファイルパス（指定がない場合は自動検索）
 
         Returns:
-            CocoroAIConfig: 設定オブジェクト
+            CocoroAIConfig: 設定オブジェクト（ファイルが変更されるまで同じインスタンスを返す）
+
+        Raises:
+            ConfigurationError: 設定ファイルの読み込み・検証に失敗した場合
         """
         if config_path is None:
             config_path = find_config_file()
+        config_path = os.path.abspath(config_path)
 
-        # 設定ファイル読み込み
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_data = json.load(f)
+        # ファイルが変更されていなければ検証済みのオブジェクトを返す
+        try:
+            st = os.stat(config_path)
+        except OSError as e:
+            raise ConfigurationError(f"設定ファイルの読み込みに失敗しました ({config_path}): {e}") from e
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _config_instance_cache.get(config_path)
+        if cached is not None and cached[:2] == key:
+            return cached[2]
 
-        # 環境変数置換
-        config_data = substitute_env_variables(config_data)
+        # 設定ファイル読み込み（環境変数置換済み）
+        config_data = _load_json_config(config_path, "設定ファイル")
 
         try:
-            return cls(**config_data)
+            config = cls.model_validate(config_data)
         except ValidationError as e:
             raise ConfigurationError(f"設定ファイルの検証に失敗しました: {e}")
 
+        _config_instance_cache[config_path] = (*key, config)
+        return config
+
 
 class ConfigurationError(Exception):
     """設定関連エラー"""
@@ -140,12 +207,64 @@ class ConfigurationError(Exception):
     pass
 
 
-def parse_args() -> argparse.Namespace:
-    """コマンドライン引数を解析する"""
+# 高速パスで扱うコマンドラインオプション（オプション名 -> 属性名）
+_CLI_OPTIONS = {
+    "--config-dir": "config_dir",
+    "-c": "config_dir",
+    "--config-file": "config_file",
+    "-f": "config_file",
+}
+
+
+def parse_args(argv: Optional[list] = None) -> "argparse.Namespace | SimpleNamespace":
+    """コマンドライン引数を解析する
+
+    既知のオプションだけであればargparseを使わずに解析する。
+    ヘルプ指定や未知の引数がある場合はargparseに任せる
+
+    Args:
+        argv: 解析する引数（指定がない場合はsys.argv[1:]）
+
+    Returns:
+        argparse.Namespace | SimpleNamespace: config_dir, config_fileを持つ解析結果
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    args = _parse_args_fast(argv)
+    if args is not None:
+        return args
+
+    # 設定の読み込みだけを行う利用者のために、argparseは使うときに読み込む
+    import argparse
+
     parser = argparse.ArgumentParser(description="CocoroCore2設定ローダー")
     parser.add_argument("--config-dir", "-c", help="設定ファイルのディレクトリパス")
     parser.add_argument("--config-file", "-f", help="設定ファイルパス")
-    return parser.parse_args()
+    return parser.parse_args(argv)
+
+
+def _parse_args_fast(argv: list) -> Optional[SimpleNamespace]:
+    """既知のオプションのみからなる引数を解析する（扱えない場合はNoneを返す）"""
+    values = {"config_dir": None, "config_file": None}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        name, sep, value = arg.partition("=")
+        dest = _CLI_OPTIONS.get(name)
+        if dest is None:
+            # -h/--help、省略形、位置引数などはargparseで処理する
+            return None
+        if not sep:
+            i += 1
+            if i >= len(argv):
+                return None
+            value = argv[i]
+        if value.startswith("-"):
+            return None
+        values[dest] = value
+        i += 1
+    return SimpleNamespace(**values)
 
 
 def find_config_file() -> str:
@@ -160,21 +279,130 @@ def find_config_file() -> str:
     Raises:
         ConfigurationError: 設定ファイルが見つからない場合
     """
-    # 実行ディレクトリの決定
-    if getattr(sys, "frozen", False):
-        # PyInstallerなどで固められたexeの場合
-        base_dir = Path(sys.executable).parent
-    else:
-        # 通常のPythonスクリプトとして実行された場合
-        base_dir = Path(__file__).parent.parent
+    global _config_path_cache
+
+    # 解決済みのパスがあれば再検索しない
+    if _config_path_cache is not None:
+        return _config_path_cache
+
+    # 存在確認だけなのでstat結果を作らないisfileで判定する
+    for config_path in _CONFIG_CANDIDATES:
+        if os.path.isfile(config_path):
+            _config_path_cache = config_path
+            return _config_path_cache
+
+    raise ConfigurationError(f"Setting.jsonが見つかりません。パス: {_CONFIG_CANDIDATES[0]}")
+
+
+# 環境変数参照（${VAR_NAME}）のパターン
+_ENV_VAR_RE = re.compile(r"\$\{([^}]+)\}")
+
+
+def _replace_env_var(match: "re.Match[str]", _get=os.environ.get) -> str:
+    """環境変数参照を値に置き換える（見つからない場合は元の文字列を返す）"""
+    return _get(match.group(1), match.group(0))
+
+
+def _replace_env_var_json(match: "re.Match[str]", _get=os.environ.get) -> str:
+    """JSONテキスト中の環境変数参照を、JSON文字列としてエスケープした値に置き換える"""
+    value = _get(match.group(1))
+    if value is None:
+        return match.group(0)
+    return json.dumps(value, ensure_ascii=False)[1:-1]
+
+
+def _loads(data: Any) -> Any:
+    """JSONをパースする（orjsonが利用可能なら使用）
+
+    Args:
+        data: JSONテキスト（bytesまたはstr）
+
+    Returns:
+        Any: パース結果
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_sorted(data: Any) -> bytes:
+    """キーをソートしたJSONバイト列に変換する（比較・キャッシュキー用）
 
-    # Setting.jsonのパス
-    config_path = base_dir.parent / "UserData2" / "Setting.json"
+    Args:
+        data: 変換対象データ
+
+    Returns:
+        bytes: JSONバイト列
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+def _intern_keys(data: Any) -> Any:
+    """辞書キーの文字列をインターンする（検証時のキー比較を高速化）
+
+    Args:
+        data: JSONから読み込んだデータ
+
+    Returns:
+        Any: キーがインターンされたデータ
+    """
+    if isinstance(data, dict):
+        return {(sys.intern(key) if isinstance(key, str) else key): _intern_keys(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_intern_keys(item) for item in data]
+    return data
+
+
+def _load_json_file(path: Path) -> Any:
+    """JSONファイルを読み込む（mtimeとサイズが変わらない限りキャッシュを返す）
+
+    ${VAR_NAME} 形式の環境変数参照はパース前のテキストに対して一括で置換する。
+    返されるデータはキャッシュと共有されるため、呼び出し側で変更しないこと
+
+    Args:
+        path: JSONファイルパス
+
+    Returns:
+        Any: 読み込んだJSONデータ
+    """
+    st = path.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(str(path))
+    if cached is not None and cached[:2] == key:
+        return cached[2]
+
+    # 参照がなければデコードせずバイト列のままパーサーに渡す
+    raw = path.read_bytes()
+    if b"${" in raw:
+        raw = _ENV_VAR_RE.sub(_replace_env_var_json, raw.decode("utf-8"))
+    data = _intern_keys(_loads(raw))
+    _config_cache[str(path)] = (*key, data)
+    return data
+
+
+def _load_json_config(config_path: Optional[str], kind: str) -> Any:
+    """設定ファイルを検索・読み込みする共通処理
+
+    Args:
+        config_path: 設定ファイルパス（指定がない場合は自動検索）
+        kind: エラーメッセージに使う設定の種別名
+
+    Returns:
+        Any: 環境変数置換済みの設定データ
 
-    if config_path.exists():
-        return str(config_path)
+    Raises:
+        ConfigurationError: 設定ファイルが見つからない、または読み込みに失敗した場合
+    """
+    if config_path is None:
+        config_path = find_config_file()
 
-    raise ConfigurationError(f"Setting.jsonが見つかりません。パス: {config_path}")
+    try:
+        return _load_json_file(Path(config_path))
+    except (OSError, ValueError) as e:
+        # ValueErrorはJSONDecodeError（json/orjson）とUTF-8のデコードエラーを含む
+        raise ConfigurationError(f"{kind}の読み込みに失敗しました ({config_path}): {e}") from e
 
 
 def substitute_env_variables(data: Any) -> Any:
@@ -189,12 +417,7 @@ def substitute_env_variables(data: Any) -> Any:
         Any: 環境変数が置換された設定データ
     """
     if isinstance(data, str):
-        # ${VAR_NAME} パターンを検索・置換
-        def replace_env_var(match):
-            var_name = match.group(1)
-            return os.environ.get(var_name, match.group(0))  # 見つからない場合は元の文字列を返す
-
-        return re.sub(r"\$\{([^}]+)\}", replace_env_var, data)
+        return _substitute_env_str(data)
 
     elif isinstance(data, dict):
         return {key: substitute_env_variables(value) for key, value in data.items()}
@@ -206,6 +429,15 @@ def substitute_env_variables(data: Any) -> Any:
         return data
 
 
+def _substitute_env_str(value: str) -> str:
+    """文字列内の環境変数参照を置換する"""
+    # 参照を含まない文字列は正規表現を通さない
+    if "${" not in value:
+        return value
+    # ${VAR_NAME} パターンを検索・置換
+    return _ENV_VAR_RE.sub(_replace_env_var, value)
+
+
 def generate_memos_config_from_setting(cocoro_config: "CocoroAIConfig") -> Dict[str, Any]:
     """Setting.jsonから動的にMemOS設定を生成する
 
@@ -270,32 +502,32 @@ def generate_memos_config_from_setting(cocoro_config: "CocoroAIConfig") -> Dict[
     return memos_config
 
 
-def load_neo4j_config() -> Dict[str, Any]:
+def load_neo4j_config(config: Optional["CocoroAIConfig"] = None) -> Dict[str, Any]:
     """Neo4j設定をSetting.jsonから動的に生成する
 
+    Args:
+        config: 読み込み済みの設定（指定された場合はファイルを読み直さない）
+
     Returns:
         Dict[str, Any]: Neo4j設定データ
 
     Raises:
-        ConfigurationError: 設定ファイルが見つからない場合
+        ConfigurationError: 設定ファイルが見つからない、または内容が不正な場合
     """
-    # 実行ディレクトリの決定
-    if getattr(sys, "frozen", False):
-        base_dir = Path(sys.executable).parent
-    else:
-        base_dir = Path(__file__).parent.parent
-
-    userdata_dir = base_dir.parent / "UserData2"
+    # 読み込み済みの設定があればそこから生成する
+    if config is not None:
+        current_char = config.current_character
+        return {
+            "uri": f"bolt://127.0.0.1:{config.cocoroMemoryDBPort}",
+            "web_port": config.cocoroMemoryWebPort,
+            "embedded_enabled": current_char.isEnableMemory if current_char else False,
+        }
+
+    # Setting.jsonから設定を読み込み（読み込み・パースのエラーは共通処理で変換済み）
+    # 検索済みのパスを再利用し、存在確認はキャッシュ判定のstatに任せる
+    setting_data = _load_json_config(None, "Setting.json")
 
-    # Setting.jsonから設定を読み込み
     try:
-        setting_path = userdata_dir / "Setting.json"
-        if not setting_path.exists():
-            raise ConfigurationError(f"Setting.jsonが見つかりません: {setting_path}")
-
-        with open(setting_path, "r", encoding="utf-8") as f:
-            setting_data = json.load(f)
-
         # Neo4j設定を動的に生成
         current_char_index = setting_data.get("currentCharacterIndex", 0)
         character_list = setting_data.get("characterList", [])
@@ -310,15 +542,34 @@ def load_neo4j_config() -> Dict[str, Any]:
         # URIの生成
         memory_db_port = setting_data.get("cocoroMemoryDBPort", 7687)
         memory_web_port = setting_data.get("cocoroMemoryWebPort", 55606)
-        uri = f"bolt://127.0.0.1:{memory_db_port}"
+    except (AttributeError, TypeError, IndexError) as e:
+        # 想定外の構造（オブジェクトでない要素など）
+        raise ConfigurationError(f"Setting.jsonの処理に失敗しました: {e}") from e
 
-        # Neo4j設定辞書を作成
-        neo4j_config = {"uri": uri, "web_port": memory_web_port, "embedded_enabled": embedded_enabled}
+    # Neo4j設定辞書を作成
+    return {"uri": f"bolt://127.0.0.1:{memory_db_port}", "web_port": memory_web_port, "embedded_enabled": embedded_enabled}
 
-    except Exception as e:
-        raise ConfigurationError(f"Setting.jsonの処理に失敗しました: {e}")
 
-    return substitute_env_variables(neo4j_config)
+def _get_mos_config_cls():
+    """MOSConfigクラスを取得する（初回のみインポート）
+
+    Returns:
+        type: MOSConfigクラス
+
+    Raises:
+        ConfigurationError: MemOSライブラリが利用できない場合
+    """
+    global _MOSConfig
+
+    if _MOSConfig is None:
+        try:
+            # 遅延インポートでMemOSの循環依存を回避
+            from memos.configs.mem_os import MOSConfig
+        except ImportError as e:
+            raise ConfigurationError(f"MemOSライブラリが利用できません: {e}")
+        _MOSConfig = MOSConfig
+
+    return _MOSConfig
 
 
 def create_mos_config_from_dict(mos_config_dict: Dict[str, Any]):
@@ -333,15 +584,12 @@ def create_mos_config_from_dict(mos_config_dict: Dict[str, Any]):
     Raises:
         ConfigurationError: MOSConfig作成に失敗した場合
     """
-    try:
-        # 遅延インポートでMemOSの循環依存を回避
-        from memos.configs.mem_os import MOSConfig
+    MOSConfig = _get_mos_config_cls()
 
+    try:
         # 辞書からMOSConfigオブジェクトを作成
-        return MOSConfig(**mos_config_dict)
+        return MOSConfig.model_validate(mos_config_dict)
 
-    except ImportError as e:
-        raise ConfigurationError(f"MemOSライブラリが利用できません: {e}")
     except Exception as e:
         raise ConfigurationError(f"MOSConfig作成に失敗しました: {e}")
 
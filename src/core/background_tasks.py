@@ -0,0 +1,27 @@
+"""
+CocoroCore2 Background Tasks
+
+投げっぱなしのバックグラウンドタスク管理
+"""
+
+import asyncio
+from typing import Coroutine, Set
+
+
+# 実行中のバックグラウンドタスク（完了前にGCされないよう参照を保持）
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def spawn_background_task(coro: Coroutine) -> asyncio.Task:
+    """バックグラウンドタスクを開始し、完了まで参照を保持する
+
+    Args:
+        coro: 実行するコルーチン
+
+    Returns:
+        asyncio.Task: 作成したタスク
+    """
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
@@ -5,6 +5,7 @@ PyInstaller実行ファイル内でNeo4jを自動起動・管理するための
 """
 
 import os
+import random
 import sys
 import time
 import socket
@@ -12,19 +13,34 @@ import logging
 import subprocess
 import threading
 from pathlib import Path
+from urllib.parse import urlsplit
 from typing import Optional, Dict, Any
 import asyncio
 
 try:
-    from neo4j import GraphDatabase
+    from neo4j import AsyncGraphDatabase
     NEO4J_DRIVER_AVAILABLE = True
 except ImportError:
     NEO4J_DRIVER_AVAILABLE = False
-    GraphDatabase = None
+    AsyncGraphDatabase = None
 
 
 logger = logging.getLogger(__name__)
 
+# パス設定（プロセス中は変わらないため一度だけ解決する）
+if getattr(sys, 'frozen', False):
+    # PyInstaller実行時
+    _BASE_DIR = Path(sys.executable).parent
+else:
+    # 開発時
+    _BASE_DIR = Path(__file__).parent.parent.parent
+
+_JAVA_HOME = _BASE_DIR / "jre"
+_NEO4J_HOME = _BASE_DIR / "neo4j"
+
+# Neo4jの標準出力を読み取る単位（バイト）
+_STDOUT_CHUNK_SIZE = 64 * 1024
+
 
 class Neo4jManager:
     """組み込みNeo4jサービス管理クラス"""
@@ -38,24 +54,23 @@ class Neo4jManager:
                 - embedded_enabled: 組み込みモード (characterList[currentCharacterIndex].isEnableMemory)
         """
         self.config = config
-        self.process: Optional[subprocess.Popen] = None
+        self.process: Optional[asyncio.subprocess.Process] = None
         self.driver = None
         self.shutdown_event = threading.Event()
         
-        # パス設定
-        if getattr(sys, 'frozen', False):
-            # PyInstaller実行時
-            self.base_dir = Path(sys.executable).parent
-        else:
-            # 開発時
-            self.base_dir = Path(__file__).parent.parent.parent
-            
-        self.java_home = self.base_dir / "jre"
-        self.neo4j_home = self.base_dir / "neo4j"
+        # 標準出力の読み取りタスクと起動完了通知
+        self._stdout_task: Optional[asyncio.Task] = None
+        self._started_event = asyncio.Event()
+        
+        # パス設定（モジュール読み込み時に解決済み）
+        self.base_dir = _BASE_DIR
+        self.java_home = _JAVA_HOME
+        self.neo4j_home = _NEO4J_HOME
         
         # 接続設定（IPv4固定）
         original_uri = config.get("uri", "bolt://localhost:7687")
         self.uri = original_uri.replace("localhost", "127.0.0.1")  # IPv4に固定
+        self.bolt_port = self._parse_bolt_port(self.uri)  # URIからBoltポート番号を抽出
         self.web_port = config.get("web_port", 55606)  # WebUIポート
         self.startup_timeout = 30
         
@@ -110,9 +125,7 @@ class Neo4jManager:
         # ドライバー切断
         if self.driver:
             try:
-                await asyncio.get_event_loop().run_in_executor(
-                    None, self.driver.close
-                )
+                await self.driver.close()
                 self.driver = None
                 logger.info("Neo4jドライバーを切断しました")
             except Exception as e:
@@ -178,13 +191,7 @@ class Neo4jManager:
                 logger.error(f"Neo4j設定ファイルが見つかりません: {config_path}")
                 return False
             
-            # URIからBoltポート番号を抽出
-            port = 7687  # デフォルト
-            if ":" in self.uri:
-                port_str = self.uri.split(":")[-1]
-                if "/" in port_str:
-                    port_str = port_str.split("/")[0]
-                port = int(port_str)
+            port = self.bolt_port
             
             # 現在の設定を読み込み
             with open(config_path, 'r', encoding='utf-8') as f:
@@ -233,6 +240,22 @@ class Neo4jManager:
             logger.error(f"Neo4j設定ファイル更新エラー: {e}")
             return False
     
+    @staticmethod
+    def _parse_bolt_port(uri: str) -> int:
+        """URIからBoltポート番号を取得
+        
+        Args:
+            uri: Neo4j接続URI
+            
+        Returns:
+            int: ポート番号（指定がない場合は7687）
+        """
+        try:
+            return urlsplit(uri).port or 7687
+        except ValueError:
+            logger.warning(f"Neo4j URIのポート番号が不正です: {uri}")
+            return 7687
+    
     def _check_port_available(self) -> bool:
         """Neo4jポートの可用性確認
         
@@ -240,19 +263,19 @@ class Neo4jManager:
             bool: ポートが利用可能時True
         """
         try:
-            # URIからポート番号を抽出
-            port = 7687  # デフォルト
-            if ":" in self.uri:
-                port_str = self.uri.split(":")[-1]
-                if "/" in port_str:
-                    port_str = port_str.split("/")[0]
-                port = int(port_str)
-            
-            # ポート確認
+            # 接続を試みる代わりにバインドできるかで確認（名前解決や接続待ちが不要）
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-                sock.settimeout(1)
-                result = sock.connect_ex(('localhost', port))
-                return result != 0  # 接続失敗 = ポート利用可能
+                if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+                    # Windows: 他のソケットと共有せずにバインドを試す
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+                else:
+                    # TIME_WAITのソケットだけが残っている場合は利用可能とみなす
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                try:
+                    sock.bind(("127.0.0.1", self.bolt_port))
+                except OSError:
+                    return False  # バインド失敗 = ポート使用中
+                return True
                 
         except Exception as e:
             logger.warning(f"ポート確認エラー: {e}")
@@ -278,16 +301,20 @@ class Neo4jManager:
             
             env = os.environ.copy()
             
-            self.process = subprocess.Popen(
-                console_cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
+            self._started_event.clear()
+            self.process = await asyncio.create_subprocess_exec(
+                *console_cmd,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
                 cwd=str(self.neo4j_home),
                 env=env,
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
             )
             
+            # パイプが詰まらないよう出力を読み続け、起動完了の出力を検出する
+            self._stdout_task = asyncio.create_task(self._drain_stdout(self.process))
+            
             logger.info(f"Neo4j console起動: PID={self.process.pid}")
             return True
             
@@ -295,6 +322,52 @@ class Neo4jManager:
             logger.error(f"Neo4j console起動エラー: {e}")
             return False
     
+    async def _drain_stdout(self, process: asyncio.subprocess.Process):
+        """Neo4jの標準出力を読み取り、起動完了の出力で通知する
+        
+        行単位ではなく大きなチャンクで読み取り、長い行でも読み取りが止まらないようにする
+        
+        Args:
+            process: Neo4jプロセス
+        """
+        pending = b""
+        try:
+            while True:
+                chunk = await process.stdout.read(_STDOUT_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                lines = (pending + chunk).split(b"\n")
+                # 末尾の改行されていない部分は次のチャンクと結合する
+                pending = lines.pop()
+                if len(pending) > _STDOUT_CHUNK_SIZE:
+                    lines.append(pending)
+                    pending = b""
+                
+                for line in lines:
+                    self._handle_stdout_line(line)
+            
+            if pending:
+                self._handle_stdout_line(pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Neo4j出力の読み取りを終了: {e}")
+    
+    def _handle_stdout_line(self, line: bytes):
+        """Neo4jの出力1行を処理
+        
+        Args:
+            line: 出力行
+        """
+        if not self._started_event.is_set() and (
+            b"Started." in line or b"Remote interface available" in line
+        ):
+            self._started_event.set()
+        # DEBUGが無効な場合はデコードと整形を行わない
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[Neo4j] %s", line.decode("utf-8", errors="replace").rstrip())
+    
     async def _wait_for_startup(self) -> bool:
         """Neo4j起動完了を待機
         
@@ -303,26 +376,41 @@ class Neo4jManager:
         """
         logger.info(f"Neo4j起動完了を待機中（最大{self.startup_timeout}秒）...")
         
-        start_time = time.time()
+        # 時刻補正の影響を受けないよう単調増加の時計で計測する
+        start_time = time.monotonic()
+        
+        # 接続テストの間隔（0.25秒から倍々に延ばし、2秒で頭打ち）
+        delay = 0.25
         
-        while time.time() - start_time < self.startup_timeout:
+        while time.monotonic() - start_time < self.startup_timeout:
             if self.shutdown_event.is_set():
                 logger.info("シャットダウン要求により起動待機を中止")
                 return False
             
             # プロセス生存確認
-            if self.process and self.process.poll() is not None:
+            if self.process and self.process.returncode is not None:
                 return_code = self.process.returncode
                 logger.error(f"Neo4jプロセスが予期せず終了しました (exit code: {return_code})")
                 return False
             
             # 接続テスト
             if await self._test_connection():
-                elapsed = time.time() - start_time
+                elapsed = time.monotonic() - start_time
                 logger.info(f"Neo4j起動完了（{elapsed:.1f}秒）")
                 return True
             
-            await asyncio.sleep(2)
+            # 間隔にジッターを加えて次の接続テストまで待つ
+            interval = delay * (0.9 + 0.2 * random.random())
+            delay = min(delay * 2, 2.0)
+            
+            # 起動完了の出力があれば待機を打ち切る（出力が検出できない場合も間隔ごとに接続テストする）
+            if self._started_event.is_set():
+                await asyncio.sleep(interval)
+            else:
+                try:
+                    await asyncio.wait_for(self._started_event.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
         
         logger.error(f"Neo4j起動タイムアウト（{self.startup_timeout}秒）")
         return False
@@ -338,56 +426,74 @@ class Neo4jManager:
                 logger.warning("neo4j-driverが利用できません")
                 return False
             
-            # 認証なしで接続テスト（neo4j.confで無効化済み）
-            test_driver = GraphDatabase.driver(
-                self.uri,
-                auth=None  # 認証無効化
-            )
-            
-            def _test():
-                with test_driver.session() as session:
-                    result = session.run("RETURN 1 AS num")
-                    record = result.single()
-                    return record["num"] == 1
-            
-            success = await asyncio.get_event_loop().run_in_executor(
-                None, _test
-            )
-            
-            test_driver.close()
-            return success
+            # 起動待機中のポーリングでも同じドライバー（接続プール）を使い回す
+            driver = self.get_driver()
+            async with driver.session() as session:
+                result = await session.run("RETURN 1 AS num")
+                record = await result.single()
+                return record["num"] == 1
             
         except Exception as e:
             logger.debug(f"Neo4j接続テスト失敗: {e}")
             return False
     
+    def get_driver(self):
+        """共有のNeo4jドライバーを取得（初回のみ作成）
+
+        ドライバーの作成は接続を伴わないため、イベントループ上で排他せずに作成できる
+
+        Returns:
+            AsyncDriver: 非同期Neo4jドライバー
+        """
+        if self.driver is None:
+            # 認証なしで接続（neo4j.confで無効化済み）
+            self.driver = AsyncGraphDatabase.driver(
+                self.uri,
+                auth=None,  # 認証無効化
+                max_connection_pool_size=self.config.get("max_connection_pool_size", 50),
+                connection_acquisition_timeout=30,
+                max_connection_lifetime=3600,
+            )
+        return self.driver
+    
     async def _stop_process(self):
-        """Neo4jプロセスを停止（1秒待機後に強制終了）"""
-        logger.info("Neo4jプロセスを停止中...")
+        """Neo4jプロセスを停止（2秒待機後にプロセスツリーを強制終了）"""
+        process = self.process
         
         try:
-            # bat経由の起動なので通常終了は不可正常終了の方法はすべて試したがNG仕方なく強制終了する
-            # バッファフラッシュのため1秒待機（根拠はない。高速化が必要なら消してもOK）
-            logger.info("データベースのバッファフラッシュを待機中...")
-            await asyncio.sleep(2)
+            # 自分で起動したプロセスがなければ何もしない（既存インスタンスは停止しない）
+            if process is None:
+                return
             
-            # 強制終了で確実に停止
-            logger.info("java.exeプロセスを強制終了中...")
+            logger.info("Neo4jプロセスを停止中...")
             
-            kill_cmd = ["taskkill", "/F", "/IM", "java.exe"]
-            result = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: subprocess.run(kill_cmd, capture_output=True, text=True, encoding='cp932', check=False)
-            )
+            # bat経由の起動なので通常終了は不可正常終了の方法はすべて試したがNG仕方なく強制終了する
+            # バッファフラッシュのため1秒待機（根拠はない。高速化が必要なら消してもOK）
+            if process.returncode is None:
+                logger.info("データベースのバッファフラッシュを待機中...")
+                await asyncio.sleep(2)
             
-            if result.returncode == 0:
-                logger.info("java.exeプロセスの強制終了が成功しました")
-            else:
-                logger.debug(f"java.exe強制終了警告 (exit code: {result.returncode})")
+            # 強制終了で確実に停止（このNeo4jのプロセスツリーだけを対象にする）
+            if process.returncode is None:
+                logger.info(f"Neo4jプロセスを強制終了中... (PID={process.pid})")
+                
+                kill_cmd = ["taskkill", "/F", "/T", "/PID", str(process.pid)]
+                result = await asyncio.get_event_loop().run_in_executor(
+                    None,
+                    lambda: subprocess.run(kill_cmd, capture_output=True, text=True, encoding='cp932', check=False)
+                )
+                
+                if result.returncode == 0:
+                    logger.info("Neo4jプロセスの強制終了が成功しました")
+                else:
+                    logger.debug(f"Neo4jプロセス強制終了警告 (exit code: {result.returncode})")
             
-            logger.info("Neo4jプロセス強制終了が完了しました")
+            logger.info("Neo4jプロセスの停止が完了しました")
             
         except Exception as e:
-            logger.error(f"強制終了エラー: {e}")
+            logger.error(f"Neo4jプロセス停止エラー: {e}")
         finally:
-            self.process = None
\ No newline at end of file
+            if self._stdout_task is not None:
+                self._stdout_task.cancel()
+                self._stdout_task = None
+            self.process = None
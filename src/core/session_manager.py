@@ -6,29 +6,40 @@ CocoroCore2 Session Manager
 
 import asyncio
 import logging
+import sys
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set
 
+
+# 1回のクリーンアップで削除するセッション数の上限
+_CLEANUP_BATCH_LIMIT = 5000
+
+
 class SessionInfo:
     """セッション情報"""
     
+    # セッション数に比例して生成されるため、インスタンスごとの__dict__を持たない
+    __slots__ = ("session_id", "user_id", "created_at", "_last_activity_mono", "request_count", "is_active")
+    
     def __init__(self, session_id: str, user_id: str):
         self.session_id = session_id
         self.user_id = user_id
         self.created_at = datetime.now()
-        self.last_activity = datetime.now()
+        # 期限判定用の最終アクティビティ時刻（時刻補正の影響を受けない単調増加の時計）
+        self._last_activity_mono = time.monotonic()
         self.request_count = 0
         self.is_active = True
     
-    def update_activity(self):
-        """アクティビティを更新"""
-        self.last_activity = datetime.now()
-        self.request_count += 1
+    @property
+    def last_activity(self) -> datetime:
+        """最終アクティビティ日時（表示用に単調時計から換算）"""
+        return datetime.now() - timedelta(seconds=time.monotonic() - self._last_activity_mono)
     
     def is_expired(self, timeout_seconds: int) -> bool:
         """セッションが期限切れかチェック"""
-        expiry_time = self.last_activity + timedelta(seconds=timeout_seconds)
-        return datetime.now() > expiry_time
+        return time.monotonic() - self._last_activity_mono > timeout_seconds
     
     def to_dict(self) -> Dict:
         """辞書形式に変換"""
@@ -58,14 +69,19 @@ class SessionManager:
         self.cleanup_interval_seconds = cleanup_interval_seconds
         self.logger = logging.getLogger(__name__)
         
-        # セッション保存
-        self.sessions: Dict[str, SessionInfo] = {}
+        # セッション保存（最終アクティビティの古い順に並べる）
+        self.sessions: "OrderedDict[str, SessionInfo]" = OrderedDict()
         
         # ユーザー別セッション（ユーザーIDから逆引き）
         self.user_sessions: Dict[str, Set[str]] = {}
         
+        # 保持中のセッションのリクエスト数合計（統計用に更新のたびに加算）
+        self._total_requests = 0
+        
         # クリーンアップタスク
         self.cleanup_task: Optional[asyncio.Task] = None
+        # セッションがない間のクリーンアップ待機を解除するイベント
+        self._session_added = asyncio.Event()
         self.is_running = False
     
     async def start(self):
@@ -108,16 +124,20 @@ class SessionManager:
         if len(self.sessions) >= self.max_sessions:
             self._cleanup_oldest_sessions()
         
+        # 同じユーザーの複数セッションで同一の文字列オブジェクトを共有する
+        user_id = sys.intern(user_id)
+        
         # 新しいセッション作成
         session = SessionInfo(session_id, user_id)
         self.sessions[session_id] = session
+        self._session_added.set()
         
         # ユーザー別セッション管理
         if user_id not in self.user_sessions:
             self.user_sessions[user_id] = set()
         self.user_sessions[user_id].add(session_id)
         
-        self.logger.debug(f"Created session: {session_id} for user: {user_id}")
+        self.logger.debug("Created session: %s for user: %s", session_id, user_id)
         return session
     
     def get_session(self, session_id: str) -> Optional[SessionInfo]:
@@ -146,12 +166,19 @@ class SessionManager:
         Returns:
             bool: 更新成功可否
         """
-        session = self.get_session(session_id)
-        if session:
-            session.update_activity()
-            self.logger.debug(f"Updated activity for session: {session_id}")
-            return True
-        return False
+        # get_sessionを経由せず、1回の参照で期限判定と更新を行う
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+        
+        now = time.monotonic()
+        if now - session._last_activity_mono > self.timeout_seconds:
+            self.remove_session(session_id)
+            return False
+        
+        self._touch(session_id, session, now)
+        self.logger.debug("Updated activity for session: %s", session_id)
+        return True
     
     def remove_session(self, session_id: str) -> bool:
         """セッションを削除
@@ -162,22 +189,23 @@ class SessionManager:
         Returns:
             bool: 削除成功可否
         """
-        session = self.sessions.get(session_id)
-        if not session:
+        # 取得と削除を1回の参照で行う
+        session = self.sessions.pop(session_id, None)
+        if session is None:
             return False
         
-        # セッション削除
-        del self.sessions[session_id]
+        self._total_requests -= session.request_count
         
         # ユーザー別セッションからも削除
         user_id = session.user_id
-        if user_id in self.user_sessions:
-            self.user_sessions[user_id].discard(session_id)
+        bucket = self.user_sessions.get(user_id)
+        if bucket is not None:
+            bucket.discard(session_id)
             # ユーザーのセッションが空になったら削除
-            if not self.user_sessions[user_id]:
+            if not bucket:
                 del self.user_sessions[user_id]
         
-        self.logger.debug(f"Removed session: {session_id}")
+        self.logger.debug("Removed session: %s", session_id)
         return True
     
     def get_user_sessions(self, user_id: str) -> List[SessionInfo]:
@@ -189,15 +217,27 @@ class SessionManager:
         Returns:
             List[SessionInfo]: セッション情報のリスト
         """
-        if user_id not in self.user_sessions:
+        session_ids = self.user_sessions.get(user_id)
+        if not session_ids:
             return []
         
+        # 期限切れがなければセットをコピーせずにそのまま反復する
+        now = time.monotonic()
+        timeout = self.timeout_seconds
+        all_sessions = self.sessions
         sessions = []
-        for session_id in list(self.user_sessions[user_id]):  # コピーして反復
-            session = self.get_session(session_id)
-            if session:
+        expired_ids = []
+        for session_id in session_ids:
+            session = all_sessions[session_id]
+            if now - session._last_activity_mono > timeout:
+                expired_ids.append(session_id)
+            else:
                 sessions.append(session)
         
+        # 期限切れのセッションは反復後に削除する
+        for session_id in expired_ids:
+            self.remove_session(session_id)
+        
         return sessions
     
     def get_session_statistics(self) -> Dict:
@@ -209,14 +249,17 @@ class SessionManager:
         active_sessions = len(self.sessions)
         total_users = len(self.user_sessions)
         
-        # アクティビティ統計
-        total_requests = sum(session.request_count for session in self.sessions.values())
+        # アクティビティ統計（更新時に集計済み）
+        total_requests = self._total_requests
         
-        # 期限切れセッション数
+        # 期限切れセッション数（古い順に並んでいるため期限内のセッションで打ち切る）
+        now = time.monotonic()
+        timeout = self.timeout_seconds
         expired_count = 0
         for session in self.sessions.values():
-            if session.is_expired(self.timeout_seconds):
-                expired_count += 1
+            if now - session._last_activity_mono <= timeout:
+                break
+            expired_count += 1
         
         return {
             "active_sessions": active_sessions,
@@ -237,47 +280,92 @@ class SessionManager:
         Returns:
             SessionInfo: セッション情報
         """
-        session = self.get_session(session_id)
-        
-        if session is None:
-            session = self.create_session(session_id, user_id)
-        else:
-            # アクティビティ更新
-            session.update_activity()
+        # 既存セッションは1回の参照で期限判定と更新を行う
+        session = self.sessions.get(session_id)
+        if session is not None:
+            now = time.monotonic()
+            if now - session._last_activity_mono <= self.timeout_seconds:
+                # アクティビティ更新
+                self._touch(session_id, session, now)
+                return session
+        
+        # 存在しない、または期限切れの場合は作り直す（create_sessionが古いものを削除する）
+        return self.create_session(session_id, user_id)
+    
+    def _touch(self, session_id: str, session: SessionInfo, now: float):
+        """セッションのアクティビティを更新（リクエスト数合計と並び順も合わせて更新）
         
-        return session
+        Args:
+            session_id: セッションID
+            session: セッション情報
+            now: 現在の単調時計の時刻
+        """
+        session._last_activity_mono = now
+        session.request_count += 1
+        self._total_requests += 1
+        self.sessions.move_to_end(session_id)
     
     def _cleanup_oldest_sessions(self):
         """最も古いセッションをクリーンアップ"""
         if not self.sessions:
             return
         
-        # 最も古いセッションを特定
-        oldest_session = min(self.sessions.values(), key=lambda s: s.last_activity)
+        # 最も古いセッションを特定（先頭が最終アクティビティの最も古いセッション）
+        oldest_session = next(iter(self.sessions.values()))
         self.remove_session(oldest_session.session_id)
-        self.logger.info(f"Cleaned up oldest session: {oldest_session.session_id}")
+        self.logger.info("Cleaned up oldest session: %s", oldest_session.session_id)
     
     async def _cleanup_loop(self):
         """期限切れセッションの定期クリーンアップ"""
         while self.is_running:
             try:
-                await asyncio.sleep(self.cleanup_interval_seconds)
+                if not self.sessions:
+                    # セッションがない間は作成されるまで起床しない
+                    self._session_added.clear()
+                    await self._session_added.wait()
+                await asyncio.sleep(self._next_cleanup_delay())
                 await self._cleanup_expired_sessions()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Error in cleanup loop: {e}")
+                self.logger.error("Error in cleanup loop: %s", e)
+    
+    def _next_cleanup_delay(self) -> float:
+        """次のクリーンアップまでの待機秒数を計算
+        
+        最も古いセッションが期限切れになるまで待つ。ただしまとめて処理するため
+        cleanup_interval_secondsより短くはしない
+        
+        Returns:
+            float: 待機秒数
+        """
+        if not self.sessions:
+            return self.cleanup_interval_seconds
+        
+        oldest_session = next(iter(self.sessions.values()))
+        until_expiry = oldest_session._last_activity_mono + self.timeout_seconds - time.monotonic()
+        return max(self.cleanup_interval_seconds, until_expiry)
     
     async def _cleanup_expired_sessions(self):
         """期限切れセッションをクリーンアップ"""
+        # ループ内で使う属性はローカル変数に束縛しておく
         expired_sessions = []
+        append = expired_sessions.append
+        timeout = self.timeout_seconds
+        remove = self.remove_session
+        now = time.monotonic()
         
+        # 最終アクティビティの古い順に並んでいるため、期限内のセッションが見つかった時点で打ち切る
         for session_id, session in self.sessions.items():
-            if session.is_expired(self.timeout_seconds):
-                expired_sessions.append(session_id)
+            if now - session._last_activity_mono <= timeout:
+                break
+            append(session_id)
+            # 1回の処理量を制限してイベントループを長時間占有しない（残りは次回に回す）
+            if len(expired_sessions) >= _CLEANUP_BATCH_LIMIT:
+                break
         
         for session_id in expired_sessions:
-            self.remove_session(session_id)
+            remove(session_id)
         
         if expired_sessions:
-            self.logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
\ No newline at end of file
+            self.logger.info("Cleaned up %d expired sessions", len(expired_sessions))
\ No newline at end of file
@@ -12,15 +12,20 @@ from typing import Any, Dict, Optional
 from memos.mem_os.main import MOS
 
 try:
-    from config import CocoroAIConfig, get_mos_config, generate_memos_config_from_setting, load_neo4j_config
+    from .config import CocoroAIConfig, get_mos_config, generate_memos_config_from_setting, load_neo4j_config
 except ImportError:
-    from src.config import CocoroAIConfig, get_mos_config, generate_memos_config_from_setting, load_neo4j_config
+    from config import CocoroAIConfig, get_mos_config, generate_memos_config_from_setting, load_neo4j_config
 
 try:
     from .core.neo4j_manager import Neo4jManager
 except ImportError:
     from core.neo4j_manager import Neo4jManager
 
+try:
+    from .core.background_tasks import spawn_background_task
+except ImportError:
+    from core.background_tasks import spawn_background_task
+
 
 class CocoroCore2App:
     """MOSを使用したCocoroCore2メインアプリケーション"""
@@ -68,7 +73,7 @@ class CocoroCore2App:
 
         # Neo4j組み込みサービス管理
         self.neo4j_manager: Optional[Neo4jManager] = None
-        self.neo4j_settings = load_neo4j_config()
+        self.neo4j_settings = load_neo4j_config(self.config)
         if self.neo4j_settings.get("embedded_enabled", False):
             try:
                 self.neo4j_manager = Neo4jManager(self.neo4j_settings)
@@ -532,7 +537,7 @@ class CocoroCore2App:
 
             # 記憶保存を非同期で実行（応答返却をブロックしない）
             messages = [{"role": "user", "content": query}, {"role": "assistant", "content": response}]
-            asyncio.create_task(self._save_conversation_memory_async(messages, effective_user_id))
+            spawn_background_task(self._save_conversation_memory_async(messages, effective_user_id))
 
             self.logger.info(f"Completed chat processing for user {effective_user_id} (memory saving in background)")
             return response
@@ -11,6 +11,9 @@ import requests
 from datetime import datetime
 
 
+# 送信待ちキューの上限（起動時バッファ500件＋区切りが収まる大きさ）
+_LOG_QUEUE_MAXSIZE = 1000
+
 # グローバルログハンドラーインスタンス
 _dock_log_handler_instance: Optional['CocoroDockLogHandler'] = None
 
@@ -40,7 +43,8 @@ class CocoroDockLogHandler(logging.Handler):
         self._buffer_sent = False  # バッファ送信済みフラグ
         
         # スレッドセーフなキューと転送スレッド
-        self._log_queue = queue.Queue()
+        # CocoroDockが応答しない間もメモリが増え続けないよう上限を設ける
+        self._log_queue = queue.Queue(maxsize=_LOG_QUEUE_MAXSIZE)
         self._sender_thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self._session: Optional[requests.Session] = None
@@ -115,8 +119,13 @@ class CocoroDockLogHandler(logging.Handler):
             try:
                 self._log_queue.put_nowait(log_message)
             except queue.Full:
-                # キューが満杯の場合は古いメッセージを破棄
-                pass
+                # キューが満杯の場合は古いメッセージを破棄して新しいものを入れる
+                try:
+                    self._log_queue.get_nowait()
+                    self._log_queue.task_done()
+                    self._log_queue.put_nowait(log_message)
+                except (queue.Empty, queue.Full):
+                    pass
 
         except Exception:
             # ログハンドラー内でエラーが発生してもメイン処理をブロックしない
@@ -171,9 +171,9 @@ def setup_api_keys_from_config(config: CocoroAIConfig):
     try:
         # Setting.jsonから OpenAI APIキーを取得
         try:
-            from config import generate_memos_config_from_setting
-        except ImportError:
             from src.config import generate_memos_config_from_setting
+        except ImportError:
+            from config import generate_memos_config_from_setting
         memos_config = generate_memos_config_from_setting(config)
         
         # chat_model の APIキー